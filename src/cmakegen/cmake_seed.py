@@ -0,0 +1,302 @@
+#!/bin/python3
+
+import argparse
+import io
+import json
+import os
+import re
+from pathlib import Path
+
+from cmake_wrapper import CMakeWrapper
+
+TOOLCHAIN_FILENAME = "toolchain.cmake"
+INIT_CACHE_FILENAME = "init-cache.cmake"
+
+# NAME:TYPE=VALUE lines of a CMakeCache.txt
+_CACHE_ENTRY_RE = re.compile(r"^([^#/][^:=]*):([A-Z]+)=(.*)$")
+# top level single line set() calls of a CMakeFiles/<ver>/CMake<LANG>Compiler.cmake
+_COMPILER_SET_RE = re.compile(r"^set\((\w+) (.*)\)$")
+_COMPILER_FILE_RE = re.compile(r"^CMake(\w+)Compiler\.cmake$")
+# --std LANG=NN
+_STD_RE = re.compile(r"^(\w+)=(\w+)$")
+# doc strings used by the Check* modules (CheckIncludeFile, CheckSymbolExists,
+# CheckCSourceCompiles, FindThreads, etc) for their cached results
+_CHECK_DOC_RE = re.compile(r"^(Have|Test|Result of) ")
+
+# Vars from the compiler file which CMake recomputes cheaply itself
+_SKIP_COMPILER_VAR_SUFFIXES = ("_LOADED", "_ENV_VAR", "_SOURCE_FILE_EXTENSIONS",
+        "_IGNORE_EXTENSIONS", "_LINKER_PREFERENCE", "_LINKER_PREFERENCE_PROPAGATES")
+
+# Cache entries carried over to the initial cache, as long as they are not empty
+_SEED_CACHE_VARS = ("CMAKE_BUILD_TYPE",)
+_SEED_CACHE_LANG_VARS = ("CMAKE_{}_STANDARD", "CMAKE_{}_COMPILER_LAUNCHER")
+
+
+def _quote(value):
+    value = value.replace("\\", "\\\\").replace("\"", "\\\"").replace("$", "\\$")
+    return f"\"{value}\""
+
+
+class CMakeSeed:
+    """Compiler and feature check results captured from a configured build dir.
+
+    A fresh build dir re-runs compiler identification, ABI detection and the
+    feature checks on every configure. Seeding a new build dir with the results
+    of a reference build (via a toolchain file and a `-C` initial cache script)
+    lets CMake skip all of that.
+    """
+
+    def __init__(self, cmake_version, compilers, compiler_timestamps, cache):
+        self._cmake_version = cmake_version
+        # {lang: [(var, cmake_value), ...]} in compiler file order
+        self._compilers = compilers
+        # {lang: (compiler path, mtime of the resolved compiler in seconds)}
+        self._compiler_timestamps = compiler_timestamps
+        # [(var, type, value, doc), ...]
+        self._cache = cache
+
+    @property
+    def cmake_version(self):
+        return self._cmake_version
+
+    @property
+    def languages(self):
+        return list(self._compilers)
+
+    @classmethod
+    def from_build_dir(cls, build_dir):
+        """Capture the seed from an already configured build dir.
+
+        Args:
+            build_dir: Build dir containing a CMakeCache.txt.
+
+        Returns:
+            A CMakeSeed.
+        """
+        build_dir = Path(build_dir)
+        cache_file = build_dir / "CMakeCache.txt"
+        if not cache_file.is_file():
+            raise ValueError(f"{build_dir} is not a configured CMake build dir")
+
+        entries = {}
+        doc = []
+        with open(cache_file) as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("//"):
+                    doc.append(line[2:])
+                    continue
+                m = _CACHE_ENTRY_RE.match(line)
+                if m:
+                    entries[m.group(1)] = (m.group(2), m.group(3), " ".join(doc))
+                doc = []
+
+        try:
+            cache_version = ".".join(entries[f"CMAKE_CACHE_{v}_VERSION"][1]
+                    for v in ("MAJOR", "MINOR", "PATCH"))
+        except KeyError:
+            raise ValueError(f"{cache_file} has no CMake version") from None
+
+        # CMakeFiles/${CMAKE_VERSION} includes any -rc/dev suffix, so look for
+        # the dir rather than building its name from the cache version.
+        version_dirs = sorted((p.parent for p in build_dir.glob("CMakeFiles/*/CMakeSystem.cmake")
+                if p.parent.name.startswith(cache_version)),
+                key=lambda p: p.stat().st_mtime)
+        compilers = {}
+        if version_dirs:
+            for path in sorted(version_dirs[-1].iterdir()):
+                m = _COMPILER_FILE_RE.match(path.name)
+                if m:
+                    compilers[m.group(1)] = cls._read_compiler_file(path)
+        if not compilers:
+            raise ValueError(f"{build_dir} has no CMakeFiles/{cache_version}*/CMake<LANG>Compiler.cmake")
+        cmake_version = version_dirs[-1].name
+
+        compiler_timestamps = {}
+        for lang, compiler_vars in compilers.items():
+            compiler = dict(compiler_vars).get(f"CMAKE_{lang}_COMPILER", "").strip("\"")
+            try:
+                timestamp = int(os.stat(os.path.realpath(compiler)).st_mtime)
+            except OSError:
+                raise ValueError(f"{lang} compiler '{compiler}' of {build_dir} not found") from None
+            compiler_timestamps[lang] = (compiler, timestamp)
+
+        cache_vars = list(_SEED_CACHE_VARS)
+        for lang in compilers:
+            for var in _SEED_CACHE_LANG_VARS:
+                cache_vars.append(var.format(lang))
+        # -DVAR=value without a type is cached as UNINITIALIZED, which is not
+        # a type set(... CACHE ...) accepts
+        cache = [(var, "STRING" if entries[var][0] == "UNINITIALIZED" else entries[var][0],
+                    entries[var][1], entries[var][2])
+                for var in cache_vars if var in entries and entries[var][1]]
+        for var, (var_type, value, var_doc) in entries.items():
+            if var_type == "INTERNAL" and _CHECK_DOC_RE.match(var_doc):
+                cache.append((var, var_type, value, var_doc))
+        return cls(cmake_version, compilers, compiler_timestamps, cache)
+
+    @staticmethod
+    def _read_compiler_file(path):
+        result = []
+        with open(path) as f:
+            for line in f:
+                m = _COMPILER_SET_RE.match(line.rstrip("\n"))
+                if m and not m.group(1).endswith(_SKIP_COMPILER_VAR_SUFFIXES):
+                    result.append((m.group(1), m.group(2)))
+        return result
+
+    def set_standard(self, lang, std):
+        """Override the captured CMAKE_<LANG>_STANDARD."""
+        var = f"CMAKE_{lang}_STANDARD"
+        self._cache = [c for c in self._cache if c[0] != var]
+        self._cache.append((var, "STRING", std, "Seeded language standard"))
+
+    def _gen_seed_branch(self, cm, branch):
+        """Appends the checks the seed depends on to branch.
+
+        The captured results are only valid for the CMake and the compilers that
+        produced them. If CMake is a different version or a compiler was
+        replaced or removed, the returned conditional is skipped and CMake falls
+        back to a normal probing configure.
+        """
+        cond = [f"CMAKE_VERSION STREQUAL \"{self._cmake_version}\""]
+        for lang, (compiler, timestamp) in self._compiler_timestamps.items():
+            real_var = f"_cmakegen_seed_{lang}_compiler"
+            timestamp_var = f"_cmakegen_seed_{lang}_timestamp"
+            branch.append(f"get_filename_component({real_var} {_quote(compiler)} REALPATH)")
+            branch.append(f"file(TIMESTAMP \"${{{real_var}}}\" {timestamp_var} \"%s\" UTC)")
+            cond.append(f"EXISTS \"${{{real_var}}}\"")
+            cond.append(f"{timestamp_var} STREQUAL \"{timestamp}\"")
+        branch.append("")
+        return cm.conditional(" AND ".join(cond))
+
+    def gen_toolchain(self):
+        cm = CMakeWrapper()
+        main_branch = cm.branch()
+        main_branch.append([f"# Generated from a CMake {self._cmake_version} reference build",
+            "# Skips compiler identification, ABI detection and compile feature checks",
+            ""])
+        for lang, compiler_vars in self._compilers.items():
+            for var, value in compiler_vars:
+                if var == f"CMAKE_{lang}_COMPILER":
+                    main_branch.append(cm.set(var, value))
+
+        seed_branch = self._gen_seed_branch(cm, main_branch)
+        for lang, compiler_vars in self._compilers.items():
+            seed_branch.append(f"set(CMAKE_{lang}_COMPILER_FORCED TRUE)")
+            for var, value in compiler_vars:
+                if var != f"CMAKE_{lang}_COMPILER":
+                    seed_branch.append(f"set({var} {value})")
+        main_branch.append(seed_branch)
+        return main_branch
+
+    def gen_init_cache(self):
+        cm = CMakeWrapper()
+        main_branch = cm.branch()
+        main_branch.append([f"# Generated from a CMake {self._cmake_version} reference build",
+            "# Use with: cmake -C <this file> ...",
+            ""])
+        for var, var_type, value, doc in self._cache:
+            if var_type != "INTERNAL":
+                main_branch.append(cm.set_cache(var, _quote(value), var_type, doc=doc))
+
+        check_vars = [c for c in self._cache if c[1] == "INTERNAL"]
+        if check_vars:
+            main_branch.append("")
+            check_branch = self._gen_seed_branch(cm, main_branch)
+            for var, var_type, value, doc in check_vars:
+                check_branch.append(cm.set_cache(var, _quote(value), var_type, doc=doc))
+            main_branch.append(check_branch)
+        return main_branch
+
+    def preset_cache_variables(self):
+        # Feature check results are left to init-cache.cmake, which guards them
+        # on the CMake version and compilers. As -D vars they would also be reported as
+        # unused by projects which do not run those checks.
+        return {var: {"type": var_type, "value": value}
+                for var, var_type, value, _ in self._cache
+                if var_type != "INTERNAL"}
+
+    def write(self, out_dir, presets_file=None):
+        """Write the toolchain file and initial cache script to out_dir.
+
+        Args:
+            out_dir: Directory for the toolchain file and initial cache script.
+            presets_file: Optional CMakePresets.json to (re)write along with them.
+        """
+        out_dir = Path(out_dir)
+        # generate everything up front so an error does not leave half written files
+        outputs = {}
+        for filename, branch in ((TOOLCHAIN_FILENAME, self.gen_toolchain()),
+                (INIT_CACHE_FILENAME, self.gen_init_cache())):
+            buf = io.StringIO()
+            branch.write(buf)
+            outputs[out_dir / filename] = buf.getvalue()
+        if presets_file:
+            presets_file = Path(presets_file)
+            toolchain_file = Path(os.path.relpath(out_dir / TOOLCHAIN_FILENAME,
+                presets_file.parent)).as_posix()
+            outputs[presets_file] = self.gen_presets(toolchain_file)
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for path, content in outputs.items():
+            with open(path, "w") as f:
+                f.write(content)
+
+    def gen_presets(self, toolchain_file, binary_dir="build"):
+        """Generate a CMakePresets.json with a 'seeded' configure preset.
+
+        Args:
+            toolchain_file: Toolchain file path, relative to the presets file.
+            binary_dir: Build dir, relative to the presets file.
+
+        Returns:
+            CMakePresets.json content as a string.
+        """
+        preset = {
+            "name": "seeded",
+            "displayName": "Seeded configure",
+            "description": f"Reuses compiler info from a CMake {self._cmake_version} reference build",
+            "binaryDir": f"${{sourceDir}}/{binary_dir}",
+            "toolchainFile": f"${{sourceDir}}/{toolchain_file}",
+            "cacheVariables": self.preset_cache_variables(),
+        }
+        presets = {
+            "version": 3,
+            "cmakeMinimumRequired": {"major": 3, "minor": 21, "patch": 0},
+            "configurePresets": [preset],
+            "buildPresets": [{"name": "seeded", "configurePreset": "seeded"}],
+        }
+        return json.dumps(presets, indent=2) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Capture a toolchain file and initial cache script from a configured build dir")
+    req_named = parser.add_argument_group('Required arguments')
+    req_named.add_argument("-b", "--build-dir", help="Reference build dir", required=True)
+    req_named.add_argument("-o", "--output-dir", help="Output directory", required=True)
+    parser.add_argument("--presets", metavar="FILE",
+                       help="Also (re)write this CMakePresets.json with a 'seeded' preset")
+    parser.add_argument("--std", metavar="LANG=NN", action="append", default=[],
+                       help="Seed CMAKE_<LANG>_STANDARD, e.g. CXX=17 (same as main.py -l c++17)")
+    args = parser.parse_args()
+
+    stds = []
+    for std in args.std:
+        m = _STD_RE.match(std)
+        if not m:
+            parser.error(f"--std expects LANG=NN, got '{std}'")
+        stds.append((m.group(1), m.group(2)))
+    try:
+        seed = CMakeSeed.from_build_dir(args.build_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    for lang, std in stds:
+        seed.set_standard(lang, std)
+    seed.write(args.output_dir, presets_file=args.presets)
+    print(f"CMake version: {seed.cmake_version}")
+    print(f"Languages: {' '.join(seed.languages)}")
+
+if __name__ == "__main__":
+    main()
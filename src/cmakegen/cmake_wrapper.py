@@ -276,6 +276,28 @@ project(
         result.append("")
         return result
 
+    def set_cache(self, var, value, var_type, *, doc="", comment=""):
+        """Wrapper for CMake's set(... CACHE ...) function.
+
+        Args:
+            var: Name of the cache entry.
+            value: Value of the entry, already quoted/escaped for CMake.
+            var_type: Cache entry type (BOOL, FILEPATH, PATH, STRING, INTERNAL).
+            doc: Cache entry doc string.
+            comment: Optional comment written before the command.
+
+        Returns:
+            CMake command as a list of lines.
+        """
+        var_type = var_type.upper()
+        if var_type not in ['BOOL', 'FILEPATH', 'PATH', 'STRING', 'INTERNAL']:
+            raise ValueError("Cache type must be BOOL, FILEPATH, PATH, STRING or INTERNAL")
+        doc = doc.replace("\\", "\\\\").replace("\"", "\\\"")
+        command = f"set({var} {value} CACHE {var_type} \"{doc}\")"
+        result = _mk_comment(comment)
+        result.append(command)
+        return result
+
     def set_property(self, scope: str, target: str, property_name: str, value: str, *,
                      append=None, append_string=None, comment="") -> list:
         """Wrapper for CMake's set_property function.
@@ -6,14 +6,16 @@ import re
 from pathlib import Path
 
 from cmake_wrapper import CMakeWrapper
+from cmake_seed import CMakeSeed
 
 def create_dirs(path):
     path.mkdir(parents=True, exist_ok=True)
 
 
 class CMakeGen:
-    def __init__(self, args):
+    def __init__(self, args, seed=None):
         self._args = args
+        self._seed = seed
         self._lc_project_name = self._args.project_name.lower()
         # normalise top level dir name
         self._top_level_dir = re.sub(r"[\s]", "_", self._args.project_name)
@@ -229,6 +231,14 @@ doxygen_add_docs(docs modern/lib.hpp "${CMAKE_CURRENT_SOURCE_DIR}/mainpage.md"
         out_file = self._root_project_path / "tests" / "CMakeLists.txt"
         self.write_cmakelists(out_file, main_branch)
 
+    def gen_seed(self):
+        if not self._seed:
+            return
+        if self._args.std:
+            self._seed.set_standard(self._args.language, self._args.std)
+        self._seed.write(self._root_project_path / "cmake",
+            presets_file=self._root_project_path / "CMakePresets.json")
+
 def main():
     parser = argparse.ArgumentParser(description="Generate CMakeLists.txt for C/C++ projects")
     # mandatory args
@@ -243,9 +253,13 @@ def main():
     parser.add_argument("--no-docs", action="store_true", help="Do not generate documanetation")
     parser.add_argument("--docs-dir", help="Documantation directory",
                        default="docs")
+    parser.add_argument("--seed-from", metavar="BUILD_DIR",
+                       help="Seed a toolchain file and initial cache from an already configured build dir")
     args = parser.parse_args()
 
+    args.std = None
     if args.language.startswith("c++"):
+        args.std = args.language[3:]
         args.language = "CXX"
     output_dir = args.output_dir
     project_name = args.project_name
@@ -254,13 +268,22 @@ def main():
     print(f"Project name: {project_name}")
     print(f"Language: {language}")
 
-    mkgen = CMakeGen(args)
+    # check the reference build dir before generating anything
+    seed = None
+    if args.seed_from:
+        try:
+            seed = CMakeSeed.from_build_dir(args.seed_from)
+        except ValueError as e:
+            parser.error(str(e))
+
+    mkgen = CMakeGen(args, seed)
     mkgen.init_dir_structure()
     mkgen.gen_main_cmakelists()
     mkgen.gen_apps()
     mkgen.gen_libs()
     mkgen.gen_tests()
     mkgen.gen_docs()
+    mkgen.gen_seed()
     mkgen.init_example_source()
 
 if __name__ == "__main__":